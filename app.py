@@ -1,37 +1,17 @@
-# Workaround for Python 3.13 missing imghdr
-import sys
-import warnings
-from unittest.mock import MagicMock
-
-if sys.version_info >= (3, 13):
-    sys.modules['imghdr'] = MagicMock()
-    warnings.warn("imghdr workaround applied for Python 3.13")
-
-# Rest of your imports...
-from flask import Flask, jsonify
+from aiohttp import web
 from bot import EbayBot
 
-import threading
-
-app = Flask(__name__)
-
-# Run the bot in a separate thread
-def run_bot():
-    bot = EbayBot()
-    bot.run()
-
-@app.route('/')
-def home():
-    return jsonify({
+async def home(request):
+    return web.json_response({
         "status": "running",
         "service": "Ebay Listing Update Bot"
     })
 
+app = web.Application()
+app.router.add_get('/', home)
+app.router.add_get('/health', home)
+
 if __name__ == '__main__':
-    # Start bot in background thread
-    bot_thread = threading.Thread(target=run_bot)
-    bot_thread.daemon = True
-    bot_thread.start()
-    
-    # Start Flask app
-    app.run(host='0.0.0.0', port=5000)
+    # Serve the HTTP endpoints from the bot's own event loop
+    bot = EbayBot(web_app=app, web_port=5000)
+    bot.run()
@@ -1,12 +1,19 @@
 import os
+import asyncio
 import logging
+import orjson
+from aiohttp import web
 from telegram import Update
+from telegram.error import TelegramError
 from telegram.ext import (
-    Updater, 
-    CommandHandler, 
-    CallbackContext,
+    AIORateLimiter,
+    Application,
+    CommandHandler,
+    ContextTypes,
+    PersistenceInput,
     PicklePersistence
 )
+from telegram.request import HTTPXRequest
 from ebay_helper import EbayHelper
 from config import Config
 
@@ -17,56 +24,129 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class OrjsonRequest(HTTPXRequest):
+    """HTTPXRequest that decodes Bot API responses with orjson."""
+
+    @staticmethod
+    def parse_json_payload(payload: bytes):
+        try:
+            return orjson.loads(payload)
+        except orjson.JSONDecodeError as exc:
+            raise TelegramError("Invalid server response") from exc
+
 class EbayBot:
-    def __init__(self):
-        self.persistence = PicklePersistence(filename='bot_data')
-        self.updater = Updater(
-            token=Config.TELEGRAM_TOKEN,
-            persistence=self.persistence,
-            use_context=True
+    def __init__(self, web_app=None, web_port=5000):
+        Config.validate()
+
+        # Only bot_data (the stored chat ID) needs to survive restarts.
+        # Writes are batched every update_interval instead of per update.
+        self.persistence = PicklePersistence(
+            filepath='bot_data',
+            store_data=PersistenceInput(
+                bot_data=True,
+                chat_data=False,
+                user_data=False,
+                callback_data=False
+            ),
+            update_interval=60
+        )
+        self.application = (
+            Application.builder()
+            .token(Config.TELEGRAM_TOKEN)
+            .persistence(self.persistence)
+            # Multiplex Bot API calls over one HTTP/2 connection; getUpdates
+            # keeps its own request so long polls don't hold the pool
+            .request(OrjsonRequest(
+                http_version='2',
+                connection_pool_size=32,
+                read_timeout=30
+            ))
+            .get_updates_request(OrjsonRequest())
+            # Token bucket shared by every outgoing call, kept under
+            # Telegram's ~30 msg/s global limit. On a 429 the limiter pauses
+            # all pending calls for retry_after and then retries them.
+            .rate_limiter(AIORateLimiter(
+                overall_max_rate=25,
+                overall_time_period=1,
+                max_retries=3
+            ))
+            # Handle updates concurrently so a slow /active (eBay round
+            # trips) doesn't hold up /start or /help for other users
+            .concurrent_updates(True)
+            .post_init(self._post_init)
+            .post_shutdown(self._post_shutdown)
+            .build()
         )
-        self.dispatcher = self.updater.dispatcher
-        
+        # Created in _post_init so its HTTP session binds to the bot's loop
+        self.ebay = None
+        # Optional aiohttp.web app served alongside polling on the same loop
+        self.web_app = web_app
+        self.web_port = web_port
+        self._web_runner = None
+
         # Register handlers
-        self.dispatcher.add_handler(CommandHandler("start", self.start))
-        self.dispatcher.add_handler(CommandHandler("active", self.active_listings))
-        self.dispatcher.add_handler(CommandHandler("help", self.help))
-        
-        # Store chat ID if provided in config
+        self.application.add_handler(CommandHandler("start", self.start))
+        self.application.add_handler(CommandHandler("active", self.active_listings))
+        self.application.add_handler(CommandHandler("help", self.help))
+
+    async def _post_init(self, application: Application):
+        """Open the eBay session and web server once the loop is running."""
+        self.ebay = EbayHelper()
+
+        if self.web_app is not None:
+            self._web_runner = web.AppRunner(self.web_app)
+            await self._web_runner.setup()
+            site = web.TCPSite(self._web_runner, '0.0.0.0', self.web_port)
+            await site.start()
+
+        # Store chat ID if provided in config (after persistence has loaded)
         if Config.CHAT_ID:
-            self.updater.bot_data['chat_id'] = Config.CHAT_ID
+            application.bot_data['chat_id'] = Config.CHAT_ID
 
-    def start(self, update: Update, context: CallbackContext):
+    async def _post_shutdown(self, application: Application):
+        """Close the eBay session and web server."""
+        if self._web_runner is not None:
+            await self._web_runner.cleanup()
+        if self.ebay is not None:
+            await self.ebay.close()
+
+    async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Send a message when the command /start is issued."""
         chat_id = update.message.chat_id
         context.bot_data['chat_id'] = chat_id
-        update.message.reply_text(
+        await update.message.reply_text(
             'Ebay Listing Bot activated!\n'
             'Use /active to see your current listings\n'
             f'Your chat ID {chat_id} has been stored.'
         )
 
-    def active_listings(self, update: Update, context: CallbackContext):
+    async def active_listings(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Send a message with active listings when /active is issued."""
-        listings = EbayHelper.get_active_listings()
-        
+        listings = await self.ebay.get_active_listings()
+
         if not listings:
-            update.message.reply_text("Couldn't fetch active listings at this time.")
+            await update.message.reply_text("Couldn't fetch active listings at this time.")
             return
-        
-        message = "📋 Your Active Listings:\n\n"
-        for item in listings[:10]:  # Limit to 10 for readability
-            details = EbayHelper.get_listing_details(item['sku'])
+
+        items = listings[:10]  # Limit to 10 for readability
+        # Fetch all details concurrently: ~1 round trip instead of one per item
+        all_details = await asyncio.gather(
+            *(self.ebay.get_listing_details(item['sku']) for item in items)
+        )
+
+        parts = ["📋 Your Active Listings:\n\n"]
+        for item, details in zip(items, all_details):
+            details = details or {}
             title = details.get('product', {}).get('title', 'No title')
-            message += f"📦 {item['sku']} - {title}\n"
+            parts.append(f"📦 {item['sku']} - {title}\n")
             if 'price' in details:
-                message += f"   💰 Price: {details['price']}\n"
-        
-        update.message.reply_text(message)
+                parts.append(f"   💰 Price: {details['price']}\n")
+
+        await update.message.reply_text("".join(parts))
 
-    def help(self, update: Update, context: CallbackContext):
+    async def help(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Send a help message."""
-        update.message.reply_text(
+        await update.message.reply_text(
             'Available commands:\n'
             '/start - Initialize the bot\n'
             '/active - Show active listings\n'
@@ -75,8 +155,13 @@ class EbayBot:
 
     def run(self):
         """Start the bot."""
-        self.updater.start_polling()
-        self.updater.idle()
+        # Long-poll getUpdates: Telegram holds the request open and answers
+        # as soon as an update arrives instead of us re-polling
+        self.application.run_polling(
+            poll_interval=0.0,
+            timeout=50,
+            drop_pending_updates=True
+        )
 
 if __name__ == '__main__':
     bot = EbayBot()
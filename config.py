@@ -17,3 +17,13 @@ class Config:
     
     # Other
     POLL_INTERVAL = int(os.getenv('POLL_INTERVAL', '300'))  # 5 minutes default
+
+    # Settings the bot cannot run without
+    REQUIRED = ('TELEGRAM_TOKEN', 'EBAY_AUTH_TOKEN')
+
+    @classmethod
+    def validate(cls):
+        """Fail fast at startup if a required setting is missing."""
+        missing = [name for name in cls.REQUIRED if not getattr(cls, name)]
+        if missing:
+            raise ValueError(f"Missing required config: {', '.join(missing)}")
@@ -1,35 +1,122 @@
-import requests
+import asyncio
+import functools
+import re
+import time
+import aiohttp
+import orjson
+from cachetools import LRUCache, TTLCache
 from config import Config
 
+INVENTORY_ITEM_URL = "https://api.ebay.com/sell/inventory/v1/inventory_item"
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+def _max_age(cache_control):
+    """Seconds a response may be reused without asking eBay again."""
+    if not cache_control or 'no-cache' in cache_control or 'no-store' in cache_control:
+        return 0
+    match = _MAX_AGE_RE.search(cache_control)
+    return int(match.group(1)) if match else 0
+
 class EbayHelper:
-    @staticmethod
-    def get_active_listings():
-        url = "https://api.ebay.com/sell/inventory/v1/inventory_item"
-        headers = {
-            "Authorization": f"Bearer {Config.EBAY_AUTH_TOKEN}",
-            "Content-Type": "application/json"
-        }
-        
+    def __init__(self):
+        # One pooled session for every eBay call so keep-alive connections
+        # are reused instead of paying a TCP+TLS handshake per request.
+        # Must be created from inside the running event loop.
+        self._session = aiohttp.ClientSession(
+            headers={
+                "Authorization": f"Bearer {Config.EBAY_AUTH_TOKEN}",
+                "Content-Type": "application/json"
+            },
+            connector=aiohttp.TCPConnector(
+                limit=20,
+                limit_per_host=8,
+                ttl_dns_cache=300,
+                keepalive_timeout=75
+            ),
+            # aiohttp's default is a 5-minute total timeout; fail fast instead
+            timeout=aiohttp.ClientTimeout(total=15, connect=5)
+        )
+        # Listing details change on the order of the poll interval, so
+        # repeat /active calls within it are served from memory
+        self._details_cache = TTLCache(maxsize=1024, ttl=Config.POLL_INTERVAL)
+        # (ETag, Last-Modified, body, fresh-until) of past responses per URL:
+        # fresh ones are reused outright, stale ones are revalidated with a
+        # conditional GET instead of refetched
+        self._responses = LRUCache(maxsize=1024)
+        # One in-flight request per URL; concurrent callers share its result
+        self._inflight = {}
+
+    async def close(self):
+        await self._session.close()
+
+    async def _single_flight(self, url, fetch):
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        # Shield so one cancelled caller doesn't cancel the shared request
+        return await asyncio.shield(task)
+
+    async def _get_json(self, url):
+        headers = {}
+        cached = self._responses.get(url)
+        if cached is not None:
+            etag, modified, data, fresh_until = cached
+            # Still within the server's max-age: skip the request entirely
+            if time.monotonic() < fresh_until:
+                return data
+            if etag:
+                headers['If-None-Match'] = etag
+            if modified:
+                headers['If-Modified-Since'] = modified
+
+        async with self._session.get(url, headers=headers) as response:
+            if response.status == 304:
+                # Unchanged since the last call: no body to download or decode
+                etag, modified, data, _ = cached
+            else:
+                response.raise_for_status()
+                data = await response.json(loads=orjson.loads)
+                etag = response.headers.get('ETag')
+                modified = response.headers.get('Last-Modified')
+            max_age = _max_age(response.headers.get('Cache-Control'))
+
+        if etag or modified or max_age:
+            self._responses[url] = (etag, modified, data, time.monotonic() + max_age)
+        return data
+
+    async def get_active_listings(self):
+        return await self._single_flight(
+            INVENTORY_ITEM_URL, self._fetch_active_listings
+        )
+
+    async def _fetch_active_listings(self):
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json().get('inventoryItems', [])
-        except requests.exceptions.RequestException as e:
+            data = await self._get_json(INVENTORY_ITEM_URL)
+            return data.get('inventoryItems', [])
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             print(f"Error fetching active listings: {e}")
             return None
 
-    @staticmethod
-    def get_listing_details(item_id):
-        url = f"https://api.ebay.com/sell/inventory/v1/inventory_item/{item_id}"
-        headers = {
-            "Authorization": f"Bearer {Config.EBAY_AUTH_TOKEN}",
-            "Content-Type": "application/json"
-        }
-        
+    async def get_listing_details(self, item_id):
+        details = self._details_cache.get(item_id)
+        if details is not None:
+            return details
+
+        url = f"{INVENTORY_ITEM_URL}/{item_id}"
+        return await self._single_flight(
+            url, functools.partial(self._fetch_listing_details, url, item_id)
+        )
+
+    async def _fetch_listing_details(self, url, item_id):
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            details = await self._get_json(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             print(f"Error fetching listing details: {e}")
             return None
+
+        # Only successful lookups are cached so failures are retried
+        self._details_cache[item_id] = details
+        return details